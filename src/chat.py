@@ -8,11 +8,24 @@ patterns, and returns an answer or fallback message.
 import argparse
 import os
 import random
+import sys
 
 import joblib
-from sklearn.metrics.pairwise import cosine_similarity
-
-from utils import normalize_text, project_root, score_bm25, score_boolean, validate_method
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+from utils import (
+	build_bm25_index,
+	build_boolean_index,
+	build_example_columns,
+	normalize_text,
+	project_root,
+	score_bm25,
+	score_bm25_matrix,
+	score_boolean,
+	validate_method,
+)
 
 
 FALLBACK_MESSAGE = "I am not sure about that yet. Please rephrase your question."
@@ -90,33 +103,41 @@ def normalized_topic(tag: str) -> str:
 	cleaned = tag.strip().lower()
 	if cleaned.startswith("web_"):
 		cleaned = cleaned[4:]
-	return cleaned.replace(" ", "_")
+	return sys.intern(cleaned.replace(" ", "_"))
 
 
 def get_available_topics(index_payload: dict) -> list[str]:
-	"""Return sorted unique topic keys from loaded examples."""
-	examples = index_payload.get("examples", [])
-	topics = {normalized_topic(str(example.get("tag", "general"))) for example in examples}
-	return sorted(topic for topic in topics if topic)
+	"""Return sorted unique topic keys from the tag column (cached on payload)."""
+	if "_topics_sorted" not in index_payload:
+		topics = {normalized_topic(tag) for tag in get_example_columns(index_payload)["tags"]}
+		index_payload["_topics_sorted"] = sorted(topic for topic in topics if topic)
+	return index_payload["_topics_sorted"]
+
+
+def get_topic_to_patterns(index_payload: dict) -> dict[str, list[str]]:
+	"""Return unique sample patterns grouped by topic (cached on payload)."""
+	if "_topic_to_patterns" not in index_payload:
+		topic_to_patterns: dict[str, list[str]] = {}
+		columns = get_example_columns(index_payload)
+		for raw_tag, raw_pattern in zip(columns["tags"], columns["patterns"]):
+			tag = normalized_topic(raw_tag)
+			pattern = raw_pattern.strip()
+			if not pattern:
+				continue
+			topic_to_patterns.setdefault(tag, [])
+			if pattern not in topic_to_patterns[tag]:
+				topic_to_patterns[tag].append(pattern)
+		index_payload["_topic_to_patterns"] = topic_to_patterns
+	return index_payload["_topic_to_patterns"]
 
 
 def show_available_topics(index_payload: dict, ui: TerminalUI) -> None:
 	"""Print available question topics and short sample patterns."""
-	examples = index_payload.get("examples", [])
-	if not examples:
+	if not len(get_example_columns(index_payload)["tags"]):
 		ui.warn("No examples found in the loaded model.")
 		return
 
-	topic_to_patterns: dict[str, list[str]] = {}
-	for example in examples:
-		tag = normalized_topic(str(example.get("tag", "general")))
-		pattern = str(example.get("pattern", "")).strip()
-		if not pattern:
-			continue
-		topic_to_patterns.setdefault(tag, [])
-		if pattern not in topic_to_patterns[tag]:
-			topic_to_patterns[tag].append(pattern)
-
+	topic_to_patterns = get_topic_to_patterns(index_payload)
 	ui.meta("\nAvailable topics and sample questions:")
 	for tag in sorted(topic_to_patterns.keys()):
 		topic_label = format_topic_name(tag)
@@ -145,17 +166,47 @@ def choose_initial_topic(index_payload: dict, ui: TerminalUI) -> str:
 
 
 def load_index(method: str) -> dict:
-	"""Load method-specific retrieval artifacts from models directory."""
+	"""Load method-specific retrieval artifacts from models directory.
+
+	NumPy buffers (including sparse matrix data) are memory-mapped
+	read-only, so the OS pages them in lazily instead of copying at startup.
+	"""
 	method = validate_method(method)
 	index_path = project_root() / "models" / f"faq_index_{method}.joblib"
-	return joblib.load(index_path)
+	return joblib.load(index_path, mmap_mode="r")
+
+
+def get_matrix_t(index_payload: dict) -> csr_matrix:
+	"""Return the transposed, L2-normalized document matrix for tfidf/bow."""
+	if "matrix_T" not in index_payload:
+		# Artifacts trained before matrix_T existed: normalize once and cache.
+		index_payload["matrix_T"] = normalize(index_payload["matrix"], norm="l2").T.tocsr()
+	return index_payload["matrix_T"]
 
 
-def compute_scores(normalized_query: str, index_payload: dict) -> list[float]:
+def get_boolean_index(index_payload: dict) -> dict:
+	"""Return the Boolean inverted index, building it for older artifacts."""
+	if "boolean_index" not in index_payload:
+		# Artifacts trained before the inverted index existed: build once and cache.
+		index_payload["boolean_index"] = build_boolean_index(index_payload["doc_tokens"])
+	return index_payload["boolean_index"]
+
+
+def get_bm25_index(index_payload: dict) -> dict:
+	"""Return the BM25 weight-matrix index, rebuilding it for older artifacts."""
+	bm25_index = index_payload["bm25_index"]
+	if "matrix" not in bm25_index:
+		# Artifacts trained before the BM25 weight matrix existed: rebuild once and cache.
+		bm25_index = build_bm25_index(index_payload["doc_tokens"])
+		index_payload["bm25_index"] = bm25_index
+	return bm25_index
+
+
+def compute_scores(normalized_query: str, index_payload: dict) -> np.ndarray:
 	"""Compute similarity/relevance scores for all patterns.
 
 	Scoring depends on the method stored in payload:
-	- tfidf/bow -> cosine similarity
+	- tfidf/bow -> cosine similarity (dot product of L2-normalized rows)
 	- bm25 -> BM25 relevance
 	- boolean -> overlap ratio
 	"""
@@ -163,15 +214,66 @@ def compute_scores(normalized_query: str, index_payload: dict) -> list[float]:
 
 	if method in {"tfidf", "bow"}:
 		vectorizer = index_payload["vectorizer"]
-		matrix = index_payload["matrix"]
-		query_vector = vectorizer.transform([normalized_query])
-		return cosine_similarity(query_vector, matrix).ravel().tolist()
+		query_vector = normalize(vectorizer.transform([normalized_query]), norm="l2")
+		return (query_vector @ get_matrix_t(index_payload)).toarray().ravel()
 	if method == "bm25":
 		query_tokens = normalized_query.split()
-		return score_bm25(query_tokens, index_payload["bm25_index"])
+		return score_bm25(query_tokens, get_bm25_index(index_payload))
 
 	query_tokens = normalized_query.split()
-	return score_boolean(query_tokens, index_payload["doc_tokens"])
+	return score_boolean(query_tokens, get_boolean_index(index_payload))
+
+
+def compute_score_matrix(normalized_queries: list[str], index_payload: dict) -> np.ndarray:
+	"""Compute scores for many queries at once (one row per query).
+
+	Same scoring as `compute_scores`, but tfidf/bow and bm25 run as a single
+	sparse matrix product over the whole batch.
+	"""
+	method = index_payload.get("method", "tfidf")
+
+	if method in {"tfidf", "bow"}:
+		vectorizer = index_payload["vectorizer"]
+		query_matrix = normalize(vectorizer.transform(normalized_queries), norm="l2")
+		return (query_matrix @ get_matrix_t(index_payload)).toarray()
+	if method == "bm25":
+		query_token_lists = [query.split() for query in normalized_queries]
+		return score_bm25_matrix(query_token_lists, get_bm25_index(index_payload))
+
+	boolean_index = get_boolean_index(index_payload)
+	rows = [score_boolean(query.split(), boolean_index) for query in normalized_queries]
+	if not rows:
+		return np.zeros((0, boolean_index["n_docs"]), dtype=np.float64)
+	return np.vstack(rows)
+
+
+def get_example_columns(index_payload: dict) -> dict:
+	"""Return per-field example columns, building them for older artifacts."""
+	if "tags" not in index_payload:
+		# Artifacts trained before example columns existed: build once and cache.
+		index_payload.update(build_example_columns(index_payload.get("examples", [])))
+	return index_payload
+
+
+def get_topic_mask(index_payload: dict, topic: str) -> np.ndarray:
+	"""Return a boolean mask selecting examples that belong to `topic`.
+
+	Per-topic masks are computed once from the tag column and cached on
+	the payload, so filtering a query costs one vectorized assignment.
+	"""
+	if "_topic_to_mask" not in index_payload:
+		tags = get_example_columns(index_payload)["tags"]
+		raw_tags_by_topic: dict[str, list[str]] = {}
+		for raw_tag in set(tags):
+			raw_tags_by_topic.setdefault(normalized_topic(raw_tag), []).append(raw_tag)
+		index_payload["_topic_to_mask"] = {
+			topic_key: np.isin(tags, raw_tags) for topic_key, raw_tags in raw_tags_by_topic.items()
+		}
+
+	mask = index_payload["_topic_to_mask"].get(topic)
+	if mask is None:
+		return np.zeros(len(get_example_columns(index_payload)["tags"]), dtype=bool)
+	return mask
 
 
 def get_answer_with_source(user_text: str, index_payload: dict, topic_filter: str = "all") -> tuple[str, float, str]:
@@ -180,28 +282,28 @@ def get_answer_with_source(user_text: str, index_payload: dict, topic_filter: st
 	if not normalized:
 		return FALLBACK_MESSAGE, 0.0, ""
 
-	examples = index_payload["examples"]
+	columns = get_example_columns(index_payload)
 	threshold = index_payload.get("threshold", 0.25)
 	scores = compute_scores(normalized, index_payload)
 
 	if topic_filter != "all":
-		for idx, example in enumerate(examples):
-			if normalized_topic(str(example.get("tag", "general"))) != topic_filter:
-				scores[idx] = float("-inf")
+		scores[~get_topic_mask(index_payload, topic_filter)] = -np.inf
 
-	if not scores or max(scores) == float("-inf"):
+	if scores.size == 0:
 		return FALLBACK_MESSAGE, 0.0, ""
 
-	best_idx = int(max(range(len(scores)), key=lambda idx: scores[idx]))
+	best_idx = int(scores.argmax())
 	best_score = float(scores[best_idx])
+	if best_score == -np.inf:
+		return FALLBACK_MESSAGE, 0.0, ""
 
 	# If relevance is too low, respond with a fixed fallback message.
 	if best_score < threshold:
 		return FALLBACK_MESSAGE, best_score, ""
 
-	responses = examples[best_idx]["responses"]
+	responses = columns["responses"][best_idx]
 	answer = random.choice(responses) if responses else FALLBACK_MESSAGE
-	source_url = str(examples[best_idx].get("source_url", ""))
+	source_url = str(columns["source_urls"][best_idx])
 	return answer, best_score, source_url
 
 
@@ -234,6 +336,7 @@ def run_chat(method: str = "tfidf") -> None:
 
 	ui.banner(method)
 	active_topic = choose_initial_topic(index_payload, ui)
+	available_topics = get_available_topics(index_payload)
 	ui.meta(f"Active topic: {format_topic_name(active_topic)}")
 	ui.meta("Use /topics to see topics, /topic <name> to switch, /topic all to remove filter.")
 	while True:
@@ -247,7 +350,7 @@ def run_chat(method: str = "tfidf") -> None:
 			ui.help()
 			continue
 		if command == "/topics":
-			ui.meta("Available topics: all | " + " | ".join(get_available_topics(index_payload)))
+			ui.meta("Available topics: all | " + " | ".join(available_topics))
 			continue
 		if command == "/list":
 			show_available_topics(index_payload, ui)
@@ -260,7 +363,6 @@ def run_chat(method: str = "tfidf") -> None:
 				continue
 
 			requested = normalized_topic(parts[1])
-			available_topics = get_available_topics(index_payload)
 			if requested == "all":
 				active_topic = "all"
 				ui.meta("Topic filter removed. Using all topics.")
@@ -12,10 +12,17 @@ import csv
 from dataclasses import dataclass
 from pathlib import Path
 
-from chat import compute_scores, load_index
+import numpy as np
+
+from chat import compute_score_matrix, get_example_columns, load_index
 from utils import SUPPORTED_METHODS, normalize_text
 
 
+# Maximum score entries (queries x documents) held per batch: 4M float64s is
+# about 32 MB, so large corpora get fewer queries per sparse matrix product.
+EVAL_SCORE_BUDGET = 4_000_000
+
+
 @dataclass
 class EvalResult:
 	"""Container for evaluation metrics of a single method."""
@@ -34,40 +41,42 @@ class EvalResult:
 
 
 def evaluate_method(method: str) -> EvalResult:
-	"""Evaluate one retrieval method and return aggregated metrics."""
+	"""Evaluate one retrieval method and return aggregated metrics.
+
+	Queries are scored in batches with `compute_score_matrix`, so each batch
+	is one sparse matrix product instead of one scoring call per pattern.
+	"""
 	payload = load_index(method)
-	examples = payload["examples"]
+	columns = get_example_columns(payload)
+	tags = columns["tags"]
 	threshold = float(payload.get("threshold", 0.25))
 
-	total = 0
+	# Query each stored pattern and evaluate whether top-1 returns same tag.
+	normalized_queries = [normalize_text(pattern) for pattern in columns["patterns"]]
+	query_indices = np.array([idx for idx, query in enumerate(normalized_queries) if query], dtype=np.int64)
+	if query_indices.size == 0:
+		return EvalResult(method=method, total=0, correct=0, fallbacks=0)
+
 	correct = 0
 	fallbacks = 0
+	batch_size = max(1, EVAL_SCORE_BUDGET // len(tags))
 
-	for query_idx, example in enumerate(examples):
-		# Query each stored pattern and evaluate whether top-1 returns same tag.
-		normalized = normalize_text(example["pattern"])
-		if not normalized:
-			continue
-
-		scores = compute_scores(normalized, payload)
-		if not scores:
-			continue
+	for start in range(0, query_indices.size, batch_size):
+		batch_indices = query_indices[start : start + batch_size]
+		scores = compute_score_matrix([normalized_queries[idx] for idx in batch_indices], payload)
+		batch_rows = np.arange(batch_indices.size)
 
-		total += 1
 		# Prevent trivial self-match by excluding the current row from ranking.
-		scores[query_idx] = float("-inf")
-
-		best_idx = int(max(range(len(scores)), key=lambda idx: scores[idx]))
-		best_score = float(scores[best_idx])
+		scores[batch_rows, batch_indices] = -np.inf
 
-		if best_score < threshold:
-			fallbacks += 1
-			continue
+		best_indices = scores.argmax(axis=1)
+		best_scores = scores[batch_rows, best_indices]
+		is_fallback = best_scores < threshold
 
-		if examples[best_idx]["tag"] == example["tag"]:
-			correct += 1
+		fallbacks += int(is_fallback.sum())
+		correct += int((~is_fallback & (tags[best_indices] == tags[batch_indices])).sum())
 
-	return EvalResult(method=method, total=total, correct=correct, fallbacks=fallbacks)
+	return EvalResult(method=method, total=int(query_indices.size), correct=correct, fallbacks=fallbacks)
 
 
 def parse_args() -> argparse.Namespace:
@@ -9,13 +9,18 @@ Builds and saves model artifacts for one retrieval method:
 """
 
 import argparse
+import os
+import tempfile
 from pathlib import Path
 
 import joblib
 from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
 
 from utils import (
 	build_bm25_index,
+	build_boolean_index,
+	build_example_columns,
 	load_csv_qa_rows_from_sources,
 	load_intents,
 	prepare_corpus,
@@ -25,6 +30,27 @@ from utils import (
 )
 
 
+def dump_atomically(payload: dict, target_path: Path) -> None:
+	"""Write `payload` to a temporary file beside `target_path`, then swap it in.
+
+	Running chat/evaluate sessions memory-map the index, so overwriting it in
+	place would corrupt their view. `os.replace` gives the new file a fresh
+	inode while existing mappings keep reading the old one.
+	"""
+	fd, tmp_name = tempfile.mkstemp(dir=target_path.parent, prefix=f".{target_path.name}.", suffix=".tmp")
+	os.close(fd)
+	try:
+		joblib.dump(payload, tmp_name)
+		# mkstemp creates the file as 0600; give it the usual umask-based mode.
+		umask = os.umask(0)
+		os.umask(umask)
+		os.chmod(tmp_name, 0o666 & ~umask)
+		os.replace(tmp_name, target_path)
+	except BaseException:
+		Path(tmp_name).unlink(missing_ok=True)
+		raise
+
+
 def train_and_save(
 	method: str = "tfidf",
 	threshold: float = 0.25,
@@ -54,18 +80,25 @@ def train_and_save(
 	if not corpus:
 		raise ValueError("No training patterns found in data/intents.json")
 
-	payload = {"method": method, "examples": examples, "threshold": threshold}
+	# Examples are stored only as per-field columns; older artifacts that carry
+	# the raw `examples` list are converted on load by chat.get_example_columns.
+	payload = {"method": method, "threshold": threshold}
+	payload.update(build_example_columns(examples))
 
 	# Method-specific artifact building.
 	if method == "tfidf":
-		vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=1)
+		# TfidfVectorizer rows are already L2-normalized, so cosine similarity
+		# reduces to a plain sparse dot product at query time.
+		# Corpus text is already lowercased by normalize_text.
+		vectorizer = TfidfVectorizer(ngram_range=(1, 2), min_df=1, lowercase=False)
 		matrix = vectorizer.fit_transform(corpus)
-		payload.update({"vectorizer": vectorizer, "matrix": matrix})
+		payload.update({"vectorizer": vectorizer, "matrix_T": matrix.T.tocsr()})
 		vocabulary_words = vectorizer.get_feature_names_out().tolist()
 	elif method == "bow":
-		vectorizer = CountVectorizer(ngram_range=(1, 1), min_df=1)
-		matrix = vectorizer.fit_transform(corpus)
-		payload.update({"vectorizer": vectorizer, "matrix": matrix})
+		# Count rows are L2-normalized once here instead of on every query.
+		vectorizer = CountVectorizer(ngram_range=(1, 1), min_df=1, lowercase=False)
+		matrix = normalize(vectorizer.fit_transform(corpus), norm="l2")
+		payload.update({"vectorizer": vectorizer, "matrix_T": matrix.T.tocsr()})
 		vocabulary_words = vectorizer.get_feature_names_out().tolist()
 	elif method == "bm25":
 		doc_tokens = [doc.split() for doc in corpus]
@@ -73,10 +106,11 @@ def train_and_save(
 		vocabulary_words = sorted({token for doc in doc_tokens for token in doc})
 	else:
 		doc_tokens = [doc.split() for doc in corpus]
-		payload.update({"doc_tokens": doc_tokens})
+		payload.update({"boolean_index": build_boolean_index(doc_tokens), "doc_tokens": doc_tokens})
 		vocabulary_words = sorted({token for doc in doc_tokens for token in doc})
 
-	joblib.dump(payload, models_dir / f"faq_index_{method}.joblib")
+	# Stored uncompressed on purpose: compressed joblib files cannot be memory-mapped on load.
+	dump_atomically(payload, models_dir / f"faq_index_{method}.joblib")
 	# These files are shared helpers for inspection/debugging.
 	joblib.dump(sorted({example["tag"] for example in examples}), models_dir / "classes.pkl")
 	joblib.dump(vocabulary_words, models_dir / "words.pkl")
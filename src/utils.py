@@ -9,16 +9,21 @@ This module keeps all reusable logic in one place:
 - preparing training corpus examples
 """
 
-import json
-import math
 import re
 import csv
+import sys
 from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+import orjson
+from scipy.sparse import csc_matrix, csr_matrix
 
-EN_STOPWORDS = {
+
+# Frozen sets: a single hash probe per token is the cheapest membership test here.
+EN_STOPWORDS = frozenset({
 	"a",
 	"an",
 	"the",
@@ -37,9 +42,9 @@ EN_STOPWORDS = {
 	"at",
 	"how",
 	"what",
-}
+})
 
-RU_STOPWORDS = {
+RU_STOPWORDS = frozenset({
 	"и",
 	"в",
 	"на",
@@ -52,31 +57,39 @@ RU_STOPWORDS = {
 	"для",
 	"к",
 	"из",
-}
+})
 
 SUPPORTED_METHODS = {"tfidf", "bow", "bm25", "boolean"}
 
+# Patterns are applied to already-lowercased text, so no uppercase ranges.
+_TOKEN_RE = re.compile(r"[a-zа-яё0-9]+")
+_CYRILLIC_RE = re.compile(r"[а-яё]")
+
 
+@lru_cache(maxsize=1)
 def project_root() -> Path:
-	"""Return project root directory (parent of src/)."""
+	"""Return project root directory (parent of src/), resolved once."""
 	return Path(__file__).resolve().parent.parent
 
 
 def load_intents(intents_path: Path | None = None) -> dict[str, Any]:
-	"""Load intents JSON file and return it as a dictionary."""
+	"""Load intents JSON file and return it as a dictionary.
+
+	orjson parses the raw bytes and decodes UTF-8 itself, skipping the
+	separate text-decoding step of the stdlib parser.
+	"""
 	path = intents_path or project_root() / "data" / "intents.json"
-	with path.open("r", encoding="utf-8") as file:
-		return json.load(file)
+	return orjson.loads(path.read_bytes())
 
 
 def contains_cyrillic(text: str) -> bool:
 	"""Detect whether text contains Cyrillic characters (Russian alphabet)."""
-	return bool(re.search(r"[а-яё]", text.lower()))
+	return _CYRILLIC_RE.search(text.lower()) is not None
 
 
 def tokenize(text: str) -> list[str]:
 	"""Split text into alphanumeric tokens for English/Russian content."""
-	return re.findall(r"[a-zA-Zа-яА-ЯёЁ0-9]+", text.lower())
+	return _TOKEN_RE.findall(text.lower())
 
 
 def validate_method(method: str) -> str:
@@ -95,109 +108,165 @@ def normalize_text(text: str) -> str:
 	Language is inferred using Cyrillic detection:
 	- Russian stopwords for Cyrillic text
 	- English stopwords otherwise
+
+	Text is lowercased once and shared by tokenization and detection.
 	"""
-	tokens = tokenize(text)
+	lowered = text.lower()
+	tokens = _TOKEN_RE.findall(lowered)
 	if not tokens:
 		return ""
 
-	if contains_cyrillic(text):
-		cleaned = [token for token in tokens if token not in RU_STOPWORDS]
-	else:
-		cleaned = [token for token in tokens if token not in EN_STOPWORDS]
+	stopwords = RU_STOPWORDS if _CYRILLIC_RE.search(lowered) is not None else EN_STOPWORDS
+	return " ".join([token for token in tokens if token not in stopwords])
+
 
-	return " ".join(cleaned)
+def build_boolean_index(doc_tokens: list[list[str]]) -> dict[str, Any]:
+	"""Precompute an inverted index (term -> document ids) for Boolean scoring."""
+	postings: dict[str, list[int]] = {}
+	for doc_idx, tokens in enumerate(doc_tokens):
+		for term in set(tokens):
+			postings.setdefault(term, []).append(doc_idx)
+
+	return {
+		"term_to_doc_ids": {term: np.array(doc_ids, dtype=np.int64) for term, doc_ids in postings.items()},
+		"n_docs": len(doc_tokens),
+	}
 
 
-def score_boolean(query_tokens: list[str], doc_tokens: list[list[str]]) -> list[float]:
+def score_boolean(query_tokens: list[str], boolean_index: dict[str, Any]) -> np.ndarray:
 	"""Score documents using simple Boolean overlap ratio.
 
 	Formula: matched_query_terms / total_query_terms
+
+	Only the postings of query terms are visited, so the cost is the sum of
+	their posting lengths rather than a scan over every document.
 	"""
+	counts = np.zeros(boolean_index["n_docs"], dtype=np.float64)
 	if not query_tokens:
-		return [0.0 for _ in doc_tokens]
+		return counts
 
 	query_set = set(query_tokens)
-	scores: list[float] = []
-	for doc in doc_tokens:
-		doc_set = set(doc)
-		matches = len(query_set.intersection(doc_set))
-		score = matches / len(query_set)
-		scores.append(score)
-	return scores
+	term_to_doc_ids = boolean_index["term_to_doc_ids"]
+	for term in query_set:
+		doc_ids = term_to_doc_ids.get(term)
+		if doc_ids is not None:
+			counts[doc_ids] += 1
+	return counts / len(query_set)
 
 
 def build_bm25_index(doc_tokens: list[list[str]]) -> dict[str, Any]:
 	"""Precompute BM25 structures from tokenized documents.
 
-	Returns a dictionary with IDF values, term frequencies per document,
-	document lengths, and BM25 constants.
+	Per-(document, term) BM25 weights do not depend on the query, so they
+	are baked into a sparse (n_docs, vocabulary) matrix at index time.
+	Tokens are encoded in one pass into a flat term-id array; term
+	frequencies, document frequencies, and IDF are then derived with
+	array operations. Returns a dictionary with the weight matrix, the
+	term-to-column mapping, IDF values, document lengths, and BM25 constants.
 	"""
+	k1 = 1.5
+	b = 0.75
 	total_docs = len(doc_tokens)
 	if total_docs == 0:
 		return {
-			"idf": {},
-			"doc_term_freqs": [],
-			"doc_lengths": [],
+			"matrix": csc_matrix((0, 0), dtype=np.float64),
+			"term_to_col": {},
+			"idf": np.zeros(0, dtype=np.float64),
+			"doc_lengths": np.zeros(0, dtype=np.int64),
 			"avg_doc_length": 0.0,
-			"k1": 1.5,
-			"b": 0.75,
+			"k1": k1,
+			"b": b,
 		}
 
-	doc_freq: Counter[str] = Counter()
-	doc_term_freqs: list[Counter[str]] = []
-	doc_lengths: list[int] = []
-
-	for tokens in doc_tokens:
-		term_freq = Counter(tokens)
-		doc_term_freqs.append(term_freq)
-		doc_lengths.append(len(tokens))
-		doc_freq.update(term_freq.keys())
-
-	avg_doc_length = sum(doc_lengths) / total_docs
-	idf: dict[str, float] = {}
-	for term, freq in doc_freq.items():
-		idf[term] = math.log(1 + (total_docs - freq + 0.5) / (freq + 0.5))
+	term_to_col: dict[str, int] = {}
+	term_ids = np.fromiter(
+		(term_to_col.setdefault(term, len(term_to_col)) for tokens in doc_tokens for term in tokens),
+		dtype=np.int32,
+	)
+	doc_lengths = np.fromiter((len(tokens) for tokens in doc_tokens), dtype=np.int64, count=total_docs)
+	avg_doc_length = float(doc_lengths.mean())
+
+	# Building CSC from (doc, term) pairs sums duplicates in the same pass, so
+	# the matrix starts out holding raw term frequencies (one entry per
+	# distinct term per document) and is reweighted in place below.
+	doc_ids = np.repeat(np.arange(total_docs, dtype=np.int32), doc_lengths)
+	matrix = csc_matrix(
+		(np.ones(term_ids.size, dtype=np.float64), (doc_ids, term_ids)),
+		shape=(total_docs, len(term_to_col)),
+	)
+
+	doc_freq = np.diff(matrix.indptr)
+	idf = np.log1p((total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+	if matrix.nnz:
+		entry_cols = np.repeat(np.arange(len(term_to_col)), doc_freq)
+		entry_tf = matrix.data
+		length_norm = k1 * (1 - b + b * (doc_lengths[matrix.indices] / avg_doc_length))
+		matrix.data = idf[entry_cols] * entry_tf * (k1 + 1) / (entry_tf + length_norm)
 
 	return {
+		"matrix": matrix,
+		"term_to_col": term_to_col,
 		"idf": idf,
-		"doc_term_freqs": doc_term_freqs,
 		"doc_lengths": doc_lengths,
 		"avg_doc_length": avg_doc_length,
-		"k1": 1.5,
-		"b": 0.75,
+		"k1": k1,
+		"b": b,
 	}
 
 
-def score_bm25(query_tokens: list[str], bm25_index: dict[str, Any]) -> list[float]:
-	"""Score each document with BM25 using precomputed index data."""
-	if not query_tokens:
-		return [0.0 for _ in bm25_index.get("doc_term_freqs", [])]
-
-	idf = bm25_index["idf"]
-	doc_term_freqs = bm25_index["doc_term_freqs"]
-	doc_lengths = bm25_index["doc_lengths"]
-	avg_doc_length = bm25_index["avg_doc_length"]
-	k1 = bm25_index["k1"]
-	b = bm25_index["b"]
-
-	if avg_doc_length == 0:
-		return [0.0 for _ in doc_term_freqs]
-
-	query_terms = Counter(query_tokens)
-	scores: list[float] = []
-	for term_freqs, doc_length in zip(doc_term_freqs, doc_lengths):
-		score = 0.0
-		for term, qf in query_terms.items():
-			if term not in term_freqs:
-				continue
-			term_idf = idf.get(term, 0.0)
-			term_tf = term_freqs[term]
-			numerator = term_tf * (k1 + 1)
-			denominator = term_tf + k1 * (1 - b + b * (doc_length / avg_doc_length))
-			score += term_idf * (numerator / denominator) * qf
-		scores.append(score)
+def score_bm25(query_tokens: list[str], bm25_index: dict[str, Any]) -> np.ndarray:
+	"""Score each document with BM25 as one sparse matrix-vector product.
+
+	Only the CSC columns of query terms present in the vocabulary are
+	touched, so query cost does not grow with vocabulary size.
+	"""
+	matrix = bm25_index["matrix"]
+	if not query_tokens or bm25_index["avg_doc_length"] == 0:
+		return np.zeros(matrix.shape[0], dtype=np.float64)
+
+	term_to_col = bm25_index["term_to_col"]
+	cols: list[int] = []
+	query_freqs: list[int] = []
+	for term, qf in Counter(query_tokens).items():
+		col = term_to_col.get(term)
+		if col is not None:
+			cols.append(col)
+			query_freqs.append(qf)
 
-	return scores
+	if not cols:
+		return np.zeros(matrix.shape[0], dtype=np.float64)
+	return matrix[:, cols] @ np.array(query_freqs, dtype=np.float64)
+
+
+def score_bm25_matrix(query_token_lists: list[list[str]], bm25_index: dict[str, Any]) -> np.ndarray:
+	"""Score many queries at once with BM25 (one row per query).
+
+	Query term frequencies are packed into a sparse (queries, vocabulary)
+	matrix and multiplied against the document weight matrix in one step.
+	"""
+	matrix = bm25_index["matrix"]
+	if bm25_index["avg_doc_length"] == 0:
+		return np.zeros((len(query_token_lists), matrix.shape[0]), dtype=np.float64)
+
+	term_to_col = bm25_index["term_to_col"]
+	rows: list[int] = []
+	cols: list[int] = []
+	query_freqs: list[int] = []
+	for query_idx, query_tokens in enumerate(query_token_lists):
+		for term, qf in Counter(query_tokens).items():
+			col = term_to_col.get(term)
+			if col is not None:
+				rows.append(query_idx)
+				cols.append(col)
+				query_freqs.append(qf)
+
+	query_matrix = csr_matrix(
+		(query_freqs, (rows, cols)),
+		shape=(len(query_token_lists), matrix.shape[1]),
+		dtype=np.float64,
+	)
+	return (query_matrix @ matrix.T).toarray()
 
 
 def prepare_corpus(intents_data: dict[str, Any]) -> tuple[list[str], list[dict[str, Any]]]:
@@ -211,7 +280,8 @@ def prepare_corpus(intents_data: dict[str, Any]) -> tuple[list[str], list[dict[s
 	examples: list[dict[str, Any]] = []
 
 	for intent in intents_data.get("intents", []):
-		tag = intent["tag"]
+		# Tags repeat across many examples; interned copies compare by identity.
+		tag = sys.intern(str(intent["tag"]))
 		responses = intent.get("responses", [])
 		for pattern in intent.get("patterns", []):
 			normalized = normalize_text(pattern)
@@ -229,6 +299,27 @@ def prepare_corpus(intents_data: dict[str, Any]) -> tuple[list[str], list[dict[s
 	return corpus, examples
 
 
+def build_example_columns(examples: list[dict[str, Any]]) -> dict[str, Any]:
+	"""Split example dictionaries into parallel per-field columns.
+
+	Hot paths (topic filtering, answer lookup, evaluation) index these
+	columns directly instead of probing one dictionary per example.
+	"""
+	return {
+		"tags": np.array([str(example.get("tag", "general")) for example in examples], dtype=object),
+		"patterns": [str(example.get("pattern", "")) for example in examples],
+		"responses": [list(example.get("responses", [])) for example in examples],
+		"source_urls": np.array([str(example.get("source_url", "")) for example in examples], dtype=object),
+	}
+
+
+def csv_field(row: list[str], column_idx: int | None) -> str:
+	"""Return a stripped CSV cell, or an empty string if the column is absent."""
+	if column_idx is None or column_idx >= len(row):
+		return ""
+	return row[column_idx].strip()
+
+
 def load_csv_qa_rows(csv_path: Path | None = None) -> list[dict[str, str]]:
 	"""Load web-sourced FAQ rows from CSV.
 
@@ -251,13 +342,21 @@ def load_csv_qa_rows(csv_path: Path | None = None) -> list[dict[str, str]]:
 
 	for csv_file in csv_files:
 		with csv_file.open("r", encoding="utf-8", newline="") as file:
-			reader = csv.DictReader(file)
-			for row in reader:
-				question = str(row.get("question", "")).strip()
-				answer = str(row.get("answer", "")).strip()
-				topic = str(row.get("topic", "general")).strip() or "general"
-				source_url = str(row.get("source_url", "")).strip()
+			reader = csv.reader(file)
+			header = next(reader, None)
+			if header is None:
+				continue
 
+			# Resolve column positions once per file instead of per-row dict lookups.
+			columns = {name: idx for idx, name in enumerate(header)}
+			question_idx = columns.get("question")
+			answer_idx = columns.get("answer")
+			topic_idx = columns.get("topic")
+			source_url_idx = columns.get("source_url")
+
+			for row in reader:
+				question = csv_field(row, question_idx)
+				answer = csv_field(row, answer_idx)
 				if not question or not answer:
 					continue
 
@@ -265,8 +364,9 @@ def load_csv_qa_rows(csv_path: Path | None = None) -> list[dict[str, str]]:
 					{
 						"question": question,
 						"answer": answer,
-						"topic": topic,
-						"source_url": source_url,
+						# Topics repeat across many rows, so share one string per value.
+						"topic": sys.intern(csv_field(row, topic_idx) or "general"),
+						"source_url": csv_field(row, source_url_idx),
 					}
 				)
 
@@ -294,7 +394,7 @@ def prepare_corpus_from_csv_rows(rows: list[dict[str, str]]) -> tuple[list[str],
 		corpus.append(normalized)
 		examples.append(
 			{
-				"tag": f"web_{row['topic']}",
+				"tag": sys.intern(f"web_{row['topic']}"),
 				"pattern": row["question"],
 				"responses": [row["answer"]],
 				"source_url": row["source_url"],
@@ -9,14 +9,27 @@ Generates:
 
 import argparse
 import csv
+import io
+import multiprocessing
+import os
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 from wordcloud import WordCloud
 
 from utils import load_intents, project_root
 
 
+# Fastest zlib level for PNG output: much cheaper encoding for somewhat larger files.
+PNG_SAVE_OPTIONS = {"compress_level": 1, "optimize": False}
+
+
 def parse_args() -> argparse.Namespace:
 	"""Parse CLI arguments for visualization input/output paths."""
 	parser = argparse.ArgumentParser(description="Generate FAQ project visualizations")
@@ -30,123 +43,236 @@ def parse_args() -> argparse.Namespace:
 		default="results/plots",
 		help="Output directory for charts and wordcloud images",
 	)
+	parser.add_argument(
+		"--fast",
+		action="store_true",
+		help="Render wordclouds at lower resolution to separate *_fast.png preview files",
+	)
+	parser.add_argument(
+		"--force",
+		action="store_true",
+		help="Re-render every image even if it is newer than its input",
+	)
 	return parser.parse_args()
 
 
-def save_wordcloud(text: str, title: str, out_path: Path) -> None:
-	"""Create and save one wordcloud PNG from text data."""
-	if not text.strip():
-		return
+def is_up_to_date(out_path: Path, input_mtime: float | None) -> bool:
+	"""Return True if `out_path` exists and is at least as new as its input.
+
+	`input_mtime=None` means the caller wants an unconditional render.
+	"""
+	if input_mtime is None or not out_path.exists():
+		return False
+	if out_path.stat().st_mtime >= input_mtime:
+		print(f"Skip {out_path.name}: up to date")
+		return True
+	return False
+
+
+# One reusable Figure per thread, so charts can render on a background thread.
+FIGURES = threading.local()
+
+
+def shared_figure() -> Figure:
+	"""Return the Figure reused by every chart drawn on the current thread.
+
+	Figures are created directly rather than through pyplot, so no GUI
+	backend is involved and threads never share pyplot's global state;
+	PNG output is rendered by Agg on save.
+	"""
+	if not hasattr(FIGURES, "figure"):
+		FIGURES.figure = Figure()
+	return FIGURES.figure
+
+
+def prepare_figure(width: float, height: float) -> tuple[Figure, Axes]:
+	"""Clear and resize the shared figure, returning it with a fresh Axes."""
+	fig = shared_figure()
+	fig.clear()
+	fig.set_size_inches(width, height)
+	return fig, fig.add_subplot()
+
+
+def word_frequencies(text: str) -> dict[str, int]:
+	"""Count words in text exactly as `WordCloud.generate` would.
+
+	Uses WordCloud's own `process_text` (same tokens, stopwords, plural and
+	case merging), so the counts can go straight to layout via
+	`generate_from_frequencies`. Tokenizing does not depend on image size.
+	"""
+	return wordcloud_renderer(1600, 900, 150).process_text(text)
 
-	wordcloud = WordCloud(
-		width=1600,
-		height=900,
+
+@lru_cache(maxsize=2)
+def wordcloud_renderer(width: int, height: int, max_words: int) -> WordCloud:
+	"""Return one shared WordCloud per size setting.
+
+	`generate_from_frequencies` replaces the previous layout, so the same
+	instance can render every cloud without paying for construction again.
+	A larger minimum font size stops placement early instead of trying
+	ever-smaller sizes for words that would be unreadable anyway.
+	"""
+	return WordCloud(
+		width=width,
+		height=height,
 		background_color="white",
 		collocations=False,
-	).generate(text)
+		max_words=max_words,
+		min_font_size=8,
+	)
+
+
+def save_wordcloud(
+	frequencies: Mapping[str, int],
+	title: str,
+	out_path: Path,
+	fast: bool = False,
+	input_mtime: float | None = None,
+) -> None:
+	"""Create and save one wordcloud PNG from word frequencies.
+
+	`fast` renders at half resolution with fewer words, which roughly
+	quarters the layout and PNG encoding work for quick iterations.
+	Rendering is skipped when the PNG is newer than `input_mtime`.
+	"""
+	if not frequencies or is_up_to_date(out_path, input_mtime):
+		return
+
+	width, height, dpi, max_words = (800, 450, 120, 100) if fast else (1600, 900, 180, 150)
+	wordcloud_image = wordcloud_renderer(width, height, max_words).generate_from_frequencies(frequencies).to_array()
+
+	fig, ax = prepare_figure(14, 8)
+	ax.imshow(wordcloud_image, interpolation="bilinear")
+	ax.axis("off")
+	ax.set_title(title)
+	fig.subplots_adjust(left=0.02, right=0.98, top=0.94, bottom=0.02)
+	fig.savefig(out_path, dpi=dpi, pil_kwargs=PNG_SAVE_OPTIONS)
 
-	plt.figure(figsize=(14, 8))
-	plt.imshow(wordcloud, interpolation="bilinear")
-	plt.axis("off")
-	plt.title(title)
-	plt.tight_layout()
-	plt.savefig(out_path, dpi=180)
-	plt.close()
 
+def save_wordcloud_job(job: tuple[Mapping[str, int], str, Path, bool, float | None]) -> None:
+	"""Unpack one (frequencies, title, out_path, fast, input_mtime) job for executor.map."""
+	save_wordcloud(*job)
 
-def build_text_blocks(intents_data: dict) -> tuple[str, str, str, list[str], list[int], list[int]]:
+
+def build_text_blocks(intents_data: dict) -> tuple[str, str, dict[str, int], list[str], np.ndarray, np.ndarray]:
 	"""Prepare combined text and counts from intents for plotting.
 
 	Returns:
 	- full question text
 	- full answer text
-	- weighted topic text (for wordcloud emphasis)
+	- topic name -> weight frequencies (for wordcloud emphasis)
 	- topic names
-	- question count per topic
-	- answer count per topic
+	- question count per topic (int32 array)
+	- answer count per topic (int32 array)
 	"""
-	all_questions: list[str] = []
-	all_answers: list[str] = []
-	topic_weights: list[str] = []
+	# Text blocks are streamed into buffers instead of collecting one list
+	# entry per pattern/response and joining later.
+	question_buf = io.StringIO()
+	answer_buf = io.StringIO()
+	intents = intents_data.get("intents", [])
 	topic_names: list[str] = []
-	question_counts: list[int] = []
-	answer_counts: list[int] = []
+	# Counts fill preallocated typed arrays so weights can be derived in one vectorized step.
+	question_counts = np.zeros(len(intents), dtype=np.int32)
+	answer_counts = np.zeros(len(intents), dtype=np.int32)
 
-	for intent in intents_data.get("intents", []):
+	for intent_idx, intent in enumerate(intents):
 		tag = str(intent.get("tag", "unknown"))
 		patterns = [str(value) for value in intent.get("patterns", [])]
 		responses = [str(value) for value in intent.get("responses", [])]
 
-		all_questions.extend(patterns)
-		all_answers.extend(responses)
+		if patterns:
+			if question_buf.tell():
+				question_buf.write(" ")
+			question_buf.write(" ".join(patterns))
+		if responses:
+			if answer_buf.tell():
+				answer_buf.write(" ")
+			answer_buf.write(" ".join(responses))
 		topic_names.append(tag)
-		question_counts.append(len(patterns))
-		answer_counts.append(len(responses))
+		question_counts[intent_idx] = len(patterns)
+		answer_counts[intent_idx] = len(responses)
 
-		weight = max(1, len(patterns) + len(responses))
-		topic_weights.extend([tag.replace("_", " ")] * weight)
+	# Topic weights go straight to the wordcloud as frequencies, so no
+	# repeated-name text has to be built and re-tokenized.
+	topic_weights = np.maximum(1, question_counts + answer_counts)
+	topic_freqs: dict[str, int] = {}
+	for tag, weight in zip(topic_names, topic_weights.tolist()):
+		topic_label = tag.replace("_", " ")
+		topic_freqs[topic_label] = topic_freqs.get(topic_label, 0) + weight
 
 	return (
-		" ".join(all_questions),
-		" ".join(all_answers),
-		" ".join(topic_weights),
+		question_buf.getvalue(),
+		answer_buf.getvalue(),
+		topic_freqs,
 		topic_names,
 		question_counts,
 		answer_counts,
 	)
 
 
-def save_topic_counts(topics: list[str], question_counts: list[int], answer_counts: list[int], out_path: Path) -> None:
+def save_topic_counts(
+	topics: list[str],
+	question_counts: np.ndarray,
+	answer_counts: np.ndarray,
+	out_path: Path,
+	input_mtime: float | None = None,
+) -> None:
 	"""Save bar chart comparing question/answer counts by topic tag."""
-	positions = range(len(topics))
+	if is_up_to_date(out_path, input_mtime):
+		return
+
+	positions = np.arange(len(topics))
 	bar_width = 0.4
 
-	plt.figure(figsize=(14, 8))
-	plt.bar([index - bar_width / 2 for index in positions], question_counts, width=bar_width, label="Questions")
-	plt.bar([index + bar_width / 2 for index in positions], answer_counts, width=bar_width, label="Answers")
-	plt.xticks(list(positions), topics, rotation=30, ha="right")
-	plt.ylabel("Count")
-	plt.title("Question and Answer Counts by Topic")
-	plt.legend()
-	plt.tight_layout()
-	plt.savefig(out_path, dpi=180)
-	plt.close()
+	fig, ax = prepare_figure(14, 8)
+	ax.bar(positions - bar_width / 2, np.asarray(question_counts, dtype=np.int32), width=bar_width, label="Questions")
+	ax.bar(positions + bar_width / 2, np.asarray(answer_counts, dtype=np.int32), width=bar_width, label="Answers")
+	ax.set_xticks(positions, topics, rotation=30, ha="right")
+	ax.set_ylabel("Count")
+	ax.set_title("Question and Answer Counts by Topic")
+	ax.legend()
+	fig.subplots_adjust(left=0.06, right=0.98, top=0.94, bottom=0.20)
+	fig.savefig(out_path, dpi=180, pil_kwargs=PNG_SAVE_OPTIONS)
 
 
-def save_eval_chart(eval_csv: Path, out_path: Path) -> None:
+def save_eval_chart(eval_csv: Path, out_path: Path, input_mtime: float | None = None) -> None:
 	"""Save bar chart from evaluation CSV (accuracy vs fallback rate)."""
 	if not eval_csv.exists():
 		print(f"Skip eval chart: CSV not found at {eval_csv}")
 		return
+	if is_up_to_date(out_path, input_mtime):
+		return
 
-	methods: list[str] = []
-	accuracies: list[float] = []
-	fallback_rates: list[float] = []
-
-	with eval_csv.open("r", encoding="utf-8") as file:
-		reader = csv.DictReader(file)
-		for row in reader:
-			methods.append(str(row["method"]))
-			accuracies.append(float(row["accuracy"]) * 100)
-			fallback_rates.append(float(row["fallback_rate"]) * 100)
-
-	if not methods:
+	lines = [line for line in eval_csv.read_text(encoding="utf-8").splitlines() if line.strip()]
+	if len(lines) < 2:
 		print("Skip eval chart: CSV has no data rows")
 		return
 
-	positions = range(len(methods))
+	# One csv.reader pass handles quoted fields; both numeric columns are then
+	# converted to a float array in a single step.
+	rows = list(csv.reader(lines))
+	header = rows[0]
+	method_idx = header.index("method")
+	accuracy_idx = header.index("accuracy")
+	fallback_idx = header.index("fallback_rate")
+
+	methods = [row[method_idx] for row in rows[1:]]
+	metrics = np.array([(row[accuracy_idx], row[fallback_idx]) for row in rows[1:]], dtype=np.float64) * 100
+	accuracies = metrics[:, 0]
+	fallback_rates = metrics[:, 1]
+
+	positions = np.arange(len(methods))
 	bar_width = 0.4
 
-	plt.figure(figsize=(12, 7))
-	plt.bar([index - bar_width / 2 for index in positions], accuracies, width=bar_width, label="Accuracy %")
-	plt.bar([index + bar_width / 2 for index in positions], fallback_rates, width=bar_width, label="Fallback Rate %")
-	plt.xticks(list(positions), methods)
-	plt.ylabel("Percent")
-	plt.title("Method Comparison: Accuracy vs Fallback Rate")
-	plt.legend()
-	plt.tight_layout()
-	plt.savefig(out_path, dpi=180)
-	plt.close()
+	fig, ax = prepare_figure(12, 7)
+	ax.bar(positions - bar_width / 2, accuracies, width=bar_width, label="Accuracy %")
+	ax.bar(positions + bar_width / 2, fallback_rates, width=bar_width, label="Fallback Rate %")
+	ax.set_xticks(positions, methods)
+	ax.set_ylabel("Percent")
+	ax.set_title("Method Comparison: Accuracy vs Fallback Rate")
+	ax.legend()
+	fig.subplots_adjust(left=0.08, right=0.98, top=0.93, bottom=0.08)
+	fig.savefig(out_path, dpi=180, pil_kwargs=PNG_SAVE_OPTIONS)
 
 
 def main() -> None:
@@ -156,21 +282,72 @@ def main() -> None:
 	out_dir = root / args.out_dir
 	out_dir.mkdir(parents=True, exist_ok=True)
 
-	intents_data = load_intents(root / "data" / "intents.json")
+	intents_path = root / "data" / "intents.json"
+	eval_csv = root / args.eval_csv
+	# Make-style incremental rebuild: outputs newer than their input are skipped.
+	intents_mtime = None if args.force else intents_path.stat().st_mtime
+	eval_mtime = None if args.force or not eval_csv.exists() else eval_csv.stat().st_mtime
+
+	intents_data = load_intents(intents_path)
 	(
 		questions_text,
 		answers_text,
-		topics_text,
+		topic_freqs,
 		topic_names,
 		question_counts,
 		answer_counts,
 	) = build_text_blocks(intents_data)
 
-	save_wordcloud(questions_text, "Wordcloud: FAQ Questions", out_dir / "wordcloud_questions.png")
-	save_wordcloud(answers_text, "Wordcloud: FAQ Answers", out_dir / "wordcloud_answers.png")
-	save_wordcloud(topics_text, "Wordcloud: FAQ Topics", out_dir / "wordcloud_topics.png")
-	save_topic_counts(topic_names, question_counts, answer_counts, out_dir / "topic_question_answer_counts.png")
-	save_eval_chart(root / args.eval_csv, out_dir / "evaluation_comparison.png")
+	# Bar charts are drawn on a background thread (each thread owns its own
+	# Figure) while this thread counts words and lays out the wordclouds.
+	chart_executor = ThreadPoolExecutor(max_workers=1)
+	chart_futures = [
+		chart_executor.submit(
+			save_topic_counts,
+			topic_names,
+			question_counts,
+			answer_counts,
+			out_dir / "topic_question_answer_counts.png",
+			intents_mtime,
+		),
+		chart_executor.submit(save_eval_chart, eval_csv, out_dir / "evaluation_comparison.png", eval_mtime),
+	]
+
+	# Fast previews go to their own files, so a later full-resolution run never
+	# mistakes a low-resolution image for an up-to-date one.
+	suffix = "_fast" if args.fast else ""
+	# Frequencies are computed lazily, only for clouds that are not up to date.
+	wordcloud_specs = [
+		(partial(word_frequencies, questions_text), "Wordcloud: FAQ Questions", f"wordcloud_questions{suffix}.png"),
+		(partial(word_frequencies, answers_text), "Wordcloud: FAQ Answers", f"wordcloud_answers{suffix}.png"),
+		(partial(dict, topic_freqs), "Wordcloud: FAQ Topics", f"wordcloud_topics{suffix}.png"),
+	]
+	# Filter up-to-date clouds here so no worker processes start for them.
+	wordcloud_jobs = [
+		(count_words(), title, out_dir / file_name, args.fast, intents_mtime)
+		for count_words, title, file_name in wordcloud_specs
+		if not is_up_to_date(out_dir / file_name, intents_mtime)
+	]
+
+	# Wordcloud layout is CPU-bound and independent per image, so each one runs
+	# in its own process. On a single core the pool would only add startup
+	# cost, so run them inline.
+	workers = min(len(wordcloud_jobs), os.cpu_count() or 1)
+	executor = (
+		ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+		if workers > 1
+		else None
+	)
+	try:
+		mapper = executor.map if executor is not None else map
+		# Consume results so worker exceptions propagate (and inline jobs run).
+		list(mapper(save_wordcloud_job, wordcloud_jobs))
+		for future in chart_futures:
+			future.result()
+	finally:
+		chart_executor.shutdown()
+		if executor is not None:
+			executor.shutdown()
 
 	print(f"Saved visualizations to: {out_dir}")
 